@@ -36,11 +36,22 @@
 
 using namespace std;
 
-int main(void) {
-	
+int main(int argc, char *argv[]) {
+
+	/* PARÁMETROS (opcional: archivo "clave = valor" como primer argumento) */
+	if (argc > 1) load_parameters(argv[1]);
+
 	/* DEFINICIÓN DE ARCHIVOS DE SALIDA DEL PROGRAMA */
 	ofstream epidemic("data/epidemia.txt", ios_base::app);
-	ofstream anim("data/animacion.txt", ios_base::app);
+	// Las trayectorias se truncan sólo si esta ejecución anima (los índices de run empiezan en 0);
+	// si no, se conservan las de la última ejecución animada.
+	ofstream trajectory, traj_index;
+	if (animation) {
+		trajectory.open("data/trajectory.bin", ios_base::trunc | ios_base::binary);
+		traj_index.open("data/trajectory_index.bin", ios_base::trunc | ios_base::binary);
+		ofstream traj_header("data/trajectory_header.txt", ios_base::trunc);
+		print_trajectory_header(traj_header);
+	}
 	ofstream metrica("data/metrica.txt", ios_base::app);
 	ofstream simulation_data("data/simulation_data.txt", ios_base::app);
 	ofstream velocity_data("data/velocity_data.txt", ios_base::app);
@@ -48,25 +59,35 @@ int main(void) {
 	print_simulation_parameters(simulation_data);
 
 	/* METRICA Y PERFORMANCE */
-	float  updates = 0;  // Contador de updates.
+	float    updates = 0;  // Contador de updates.
+	uint32_t run     = 0;  // Contador de realizaciones (índice de trayectorias).
 	size_t start_s = clock();
 
 	/* SIMULACION */
 	gen.seed(seed);
 
-	for (KIND vel_crit = 0.055; vel_crit < 0.15; vel_crit += 0.005) {
+	for (KIND vel_crit = v_start; vel_crit < v_stop; vel_crit += v_step) {
 		active_velocity = vel_crit;
 		ofstream final_state("data/evolution_" + to_string(vel_crit) + ".txt", ios_base::app);
+		ofstream speed_hist("data/speed_histogram_" + to_string(vel_crit) + ".txt", ios_base::app);
+
+		/* HISTOGRAMAS POR VELOCIDAD (acumulados sobre realizaciones) */
+		vector<vector<double>> histogram(4, vector<double>(n_speed_bins, 0));
+
 		cout << "ACTIVE VEL: " << active_velocity << endl;
-		for (size_t n_simulaciones = 0; n_simulaciones < 300; n_simulaciones++) {
+		for (size_t n_simulaciones = 0; n_simulaciones < n_replicas; n_simulaciones++) {
 			print_header(n_simulaciones);
 			/* DECLARACIÓN DE VARIABLES */
 			vector<particle> system,
 							 system_new;
 			vector<bool>     inter;        	// Flag de interacción.
 			vector<size_t>   state_vector;  // (S, I, R) vector.
+			vector<KIND>     infection_time; // Tiempo de infección de cada agente.
+			vector<size_t>   secondary;      // Casos secundarios de cada agente.
 			
 			inter.resize(N, false);
+			infection_time.resize(N, -1);
+			secondary.resize(N, 0);
 			state_vector.resize(spin, 0);
 
 			/* INICIALIZAMOS GRILLA */
@@ -78,6 +99,7 @@ int main(void) {
 			/* CONDICIÓN INICIAL */
 			init_system(system, state_vector, grid);
 			system_new.resize(system.size());
+			for (size_t p = 0; p < N; p++) if (system[p].is_infected()) infection_time[p] = 0;
 			
 			//print_state(state_vector);
 
@@ -104,9 +126,10 @@ int main(void) {
 			while (state_vector[1] > 0) {
 				CHECK(time_step, (int)2e02) print_epidemic_tofile(epidemic, state_vector, time_step);
 				CHECK(time_step, (int)2e04) printf("Time: %0.f\n", TIME(time_step, delta_time));
+				if (animation) CHECK(time_step, anim_step) print_frame_tobinary(trajectory, traj_index, system, run, time_step);
 				time_step++;
 
-				update_system(system, system_new, state_vector, grid, inter, time_step, anim);
+				update_system(system, system_new, state_vector, grid, inter, infection_time, secondary, time_step);
 				
 				if (i_max < state_vector[1]) {
 					i_max = state_vector[1];
@@ -115,14 +138,18 @@ int main(void) {
 			}  // WHILE
 
 			updates += static_cast<float>(time_step);
+			run++;
 
 			/* ESCRITURA DE RESULTADOS */
 			print_finalstate_tofile(final_state, state_vector, i_max, t_max, time_step);
+			accumulate_speed_histogram(system, infection_time, secondary, histogram);
 			print_result_header();
 			print_state(state_vector);
 			cout << endl;
 		}  // FOR SIMUL
+		print_speed_histogram_tofile(speed_hist, histogram);
 		final_state.close();
+		speed_hist.close();
 	}
 	/* IMPRESION EN PANTALLA */
 	int   stop_s       = clock();
@@ -137,7 +164,8 @@ int main(void) {
 
 
 	epidemic.close();
-	anim.close();
+	trajectory.close();
+	traj_index.close();
 	metrica.close();
 	simulation_data.close();
 	velocity_data.close();
@@ -0,0 +1,218 @@
+import functools
+import hashlib
+import itertools
+import json
+import numbers
+import os
+import shutil
+import struct
+import subprocess
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List
+
+# =======================================================================================#
+# Runtime parameters (defaults mirror headers/parameters.h)
+# =======================================================================================#
+DEFAULT_PARAMETERS: Dict[str, Any] = {
+    "N": 1000,
+    "L": 150,  # integer: the engine grid has L x L unit cells
+    "delta_time": 0.05,
+    "active_velocity": 0.01,
+    "velocity_distribution": -1,  # 0 exponential, 1 power law, otherwise uniform
+    "p_init": 0.0,
+    "tau_i": 200.0,
+    "tau_r": 500.0,
+    "alpha": 100.0,
+    "k_powerl": 2.096,
+    "v_min": 0.01,
+    "v_max": 4.0,
+    "v_hist_min": 1e-4,
+    "v_hist_max": 4.0,
+    "n_replicas": 300,
+    "seed": 1,
+}
+
+BINARY = "./agentes_test"
+CACHE_DIR = "./cache"
+
+
+# =======================================================================================#
+# PARAMETER SETS
+# =======================================================================================#
+def _float32(value: Any) -> float:
+    return struct.unpack("f", struct.pack("f", float(value)))[0]
+
+
+def _normalise(key: str, value: Any, default: Any) -> Any:
+    """Cast `value` to the type of `default`, refusing to truncate integer parameters.
+
+    Reals are rounded to float32, the KIND the engine reads them as, so that values it
+    cannot tell apart (0.1 + 0.2 and 0.3, or np.arange round-off) hash equally.
+    """
+    if isinstance(default, int):
+        if isinstance(value, numbers.Integral):
+            return int(value)
+        if float(value) != int(float(value)):
+            raise ValueError(f"{key} must be an integer, got {value!r}")
+        return int(float(value))
+    return _float32(value)
+
+
+def complete_point(point: Dict[str, Any]) -> Dict[str, Any]:
+    """Fill in defaults and normalise types, so that equal points hash equally."""
+    unknown = set(point) - set(DEFAULT_PARAMETERS)
+    if unknown:
+        raise KeyError(f"Unknown parameters: {sorted(unknown)}")
+    point = {
+        key: _normalise(key, point.get(key, default), default)
+        for key, default in sorted(DEFAULT_PARAMETERS.items())
+    }
+    if point["L"] <= 0:
+        raise ValueError(f"L must be a positive integer, got {point['L']!r}")
+    return point
+
+
+def expand_grid(base: Dict[str, Any], **axes: List[Any]) -> List[Dict[str, Any]]:
+    """Cartesian product of `axes` on top of `base`.
+
+    >>> expand_grid({"N": 5000}, active_velocity=[0.02, 0.03], seed=[1, 2])  # 4 points
+    """
+    names = list(axes)
+    return [
+        complete_point({**base, **dict(zip(names, values))})
+        for values in itertools.product(*(axes[name] for name in names))
+    ]
+
+
+@functools.lru_cache(maxsize=None)
+def _file_hash(path: str, mtime_ns: int, size: int) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as file:
+        for block in iter(lambda: file.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def engine_hash(binary: str = BINARY) -> str:
+    """Hash of the binary that produces the results; rebuilding it invalidates the cache.
+
+    Hashing the binary rather than the sources keeps a binary left stale after an edit
+    of agentes.cpp or headers/*.h from storing its results under the new sources.
+    """
+    path = os.path.abspath(binary)
+    stat = os.stat(path)
+    return _file_hash(path, stat.st_mtime_ns, stat.st_size)
+
+
+def point_hash(point: Dict[str, Any], binary: str = BINARY) -> str:
+    """Content address of a fully specified point run by `binary`."""
+    payload = {"engine": engine_hash(binary), **complete_point(point)}
+    encoded = json.dumps(payload, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(encoded.encode()).hexdigest()
+
+
+def write_parameter_file(point: Dict[str, Any], path: str) -> None:
+    """Write `point` in the "key = value" format read by load_parameters (agentes.h).
+
+    The engine sweeps [v_start, v_stop) in steps of v_step; a single point runs one
+    velocity, active_velocity.
+    """
+    point = complete_point(point)
+    velocity = point.pop("active_velocity")
+    point.update(v_start=velocity, v_stop=velocity + 0.5, v_step=1.0)
+    with open(path, "w") as file:
+        for key, value in point.items():
+            if isinstance(value, float):
+                # Shortest text the engine reads back as the same float32.
+                value = next(
+                    repr(float(text))
+                    for text in (f"{value:.{digits}g}" for digits in range(1, 10))
+                    if _float32(text) == _float32(value)
+                )
+            file.write(f"{key} = {value}\n")
+
+
+# =======================================================================================#
+# RESULT CACHE
+# =======================================================================================#
+def cache_path(key: str, cache_dir: str = CACHE_DIR) -> str:
+    return os.path.join(cache_dir, key[:2], key)
+
+
+def is_cached(
+    point: Dict[str, Any], binary: str = BINARY, cache_dir: str = CACHE_DIR
+) -> bool:
+    return os.path.isdir(cache_path(point_hash(point, binary), cache_dir))
+
+
+def run_point(
+    point: Dict[str, Any], binary: str = BINARY, cache_dir: str = CACHE_DIR
+) -> str:
+    """Simulate `point` unless cached and return the cache entry holding its data/ files.
+
+    The run happens in a scratch directory next to the entry and is moved into place
+    only once it finishes, so an interrupted run never leaves a partial entry.
+    """
+    point = complete_point(point)
+    key = point_hash(point, binary)
+    entry = cache_path(key, cache_dir)
+    if os.path.isdir(entry):
+        return entry
+
+    os.makedirs(os.path.dirname(entry), exist_ok=True)
+    scratch = tempfile.mkdtemp(prefix=f"{key}.", dir=os.path.dirname(entry))
+    try:
+        os.mkdir(os.path.join(scratch, "data"))
+        write_parameter_file(point, os.path.join(scratch, "parameters.txt"))
+        with open(os.path.join(scratch, "stdout.txt"), "w") as log:
+            subprocess.run(
+                [os.path.abspath(binary), "parameters.txt"],
+                cwd=scratch,
+                stdout=log,
+                check=True,
+            )
+        with open(os.path.join(scratch, "point.json"), "w") as file:
+            json.dump({"engine": engine_hash(binary), **point}, file, indent=2)
+        os.replace(scratch, entry)
+    except OSError:
+        # Another worker finished the same point first.
+        if not os.path.isdir(entry):
+            raise
+    finally:
+        shutil.rmtree(scratch, ignore_errors=True)
+    return entry
+
+
+def run_sweep(
+    points: List[Dict[str, Any]],
+    binary: str = BINARY,
+    cache_dir: str = CACHE_DIR,
+    workers: int = 1,
+) -> Dict[str, str]:
+    """Run every distinct point of `points` that is not cached yet.
+
+    Returns {hash: cache entry} for all points. Overlapping sweeps share entries, so
+    only the missing points are simulated.
+    """
+    unique = {point_hash(point, binary): complete_point(point) for point in points}
+    missing = [
+        point for point in unique.values() if not is_cached(point, binary, cache_dir)
+    ]
+    print(f"{len(unique)} points, {len(unique) - len(missing)} cached, {len(missing)} to run")
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        list(pool.map(lambda point: run_point(point, binary, cache_dir), missing))
+    return {key: cache_path(key, cache_dir) for key in unique}
+
+
+if __name__ == "__main__":
+    # Example: exponential speeds, the velocity window of Fig. 1, three seeds.
+    points = expand_grid(
+        {"velocity_distribution": 0, "n_replicas": 100},
+        active_velocity=[0.01, 0.015, 0.02, 0.025, 0.03],
+        seed=[1, 2, 3],
+    )
+    entries = run_sweep(points, workers=1)
+    for key, entry in entries.items():
+        print(key[:12], entry)
@@ -3,6 +3,61 @@
 
 using namespace std;
 
+/* PARÁMETROS EN TIEMPO DE EJECUCIÓN */
+// Recalcula las probabilidades por paso de tiempo a partir de los tiempos característicos.
+void update_derived_parameters(void)
+{
+	p_infection   = (1 / tau_i) * delta_time;
+	p_recfractary = (1 / tau_r) * delta_time;
+	p_rotation    = (1 / alpha) * delta_time;
+}
+
+// Lee un archivo con líneas "clave = valor" (las líneas vacías o con # se ignoran).
+// Las claves ausentes conservan su valor de parameters.h; una clave desconocida aborta.
+void load_parameters(const char *path)
+{
+	map<string, KIND*> real_parameters = {
+		{"L", &L}, {"delta_time", &delta_time}, {"active_velocity", &active_velocity},
+		{"v_start", &v_start}, {"v_stop", &v_stop}, {"v_step", &v_step},
+		{"p_init", &p_init}, {"tau_i", &tau_i}, {"tau_r", &tau_r}, {"alpha", &alpha},
+		{"k_powerl", &k_powerl}, {"v_min", &v_min}, {"v_max", &v_max},
+		{"v_hist_min", &v_hist_min}, {"v_hist_max", &v_hist_max}
+	};
+	map<string, size_t*> size_parameters = {{"N", &N}, {"n_replicas", &n_replicas}};
+
+	ifstream file(path);
+	if (!file) {
+		cerr << "No se pudo abrir el archivo de parametros: " << path << endl;
+		exit(1);
+	}
+
+	string line, key, equal;
+	while (getline(file, line)) {
+		istringstream fields(line);
+		if (!(fields >> key) or key[0] == '#') continue;
+		fields >> equal;
+
+		if (real_parameters.count(key)) fields >> *real_parameters[key];
+		else if (size_parameters.count(key)) fields >> *size_parameters[key];
+		else if (key == "velocity_distribution") fields >> velocity_distribution;
+		else if (key == "seed") fields >> seed;
+		else {
+			cerr << "Parametro desconocido: " << key << endl;
+			exit(1);
+		}
+		if (equal != "=" or fields.fail()) {
+			cerr << "Linea invalida en " << path << ": " << line << endl;
+			exit(1);
+		}
+	}
+	// La grilla tiene floor(L) celdas por lado y b_condition envuelve con L: L debe ser entero.
+	if (L <= 0 or L != floor(L)) {
+		cerr << "L debe ser un entero positivo: " << L << endl;
+		exit(1);
+	}
+	update_derived_parameters();
+}
+
 void
 init_system( vector<particle>            &system       ,  
 			 vector<size_t>              &state_vector , 
@@ -43,8 +98,9 @@ update_system(  vector<particle>            &system      ,
 				vector<size_t>              &state_vector, 
 				vector<vector<set<size_t>>> &grid        ,
 				vector<bool>                &inter       ,
-				int                         &time_step    ,
-				ofstream                    &anim          )
+				vector<KIND>                &infection_time,
+				vector<size_t>              &secondary   ,
+				int                         &time_step     )
 {
 	size_t healthy=0, infected=0, refract=0;
 	state_vector = {0UL,0UL,0UL};
@@ -83,16 +139,6 @@ update_system(  vector<particle>            &system      ,
 
 		state_vector = {healthy, infected, refract};
 		
-		//Animacion (records prev. system state):
-		if (animation and (time_step-1) % anim_step == 0) {
-			for(size_t p=0; p < N; p++) {
-				anim << system[p].x           << " ";
-				anim << system[p].y           << " ";
-				anim << (time_step - 1) * delta_time       << " ";
-				anim << system[p].get_state() << endl;
-			}
-		} // If animacion
-		
 		/*Estabilzamos el set*/
 		for(size_t p=0; p<N; p++) {
 			int i_new = floor(system_new[p].x),
@@ -101,6 +147,12 @@ update_system(  vector<particle>            &system      ,
 			int i_old = floor(system[p].x),
 				j_old = floor(system[p].y);
 
+			// Nuevos infectados: tiempo de infección y casos secundarios del infector.
+			if (system[p].is_healthy() and system_new[p].is_infected()) {
+				infection_time[p] = delta_time * (KIND)time_step;
+				if (system_new[p].infector >= 0) secondary[system_new[p].infector]++;
+			}
+
 			if (grid[i_new][j_new].find(p) == grid[i_new][j_new].end()){
 				grid[i_old][j_old].erase(p);
 				grid[i_new][j_new].insert(p);
@@ -110,6 +162,83 @@ update_system(  vector<particle>            &system      ,
 }
 
 
+/* HISTOGRAMAS RESUELTOS EN VELOCIDAD */
+// Bin logarítmico de la velocidad v en [v_hist_min, v_hist_max).
+int speed_bin(KIND v)
+{
+	// v = 0 es posible (dist. exponencial con dis(gen) == 0): log(0) = -inf no es convertible a int.
+	if (v <= v_hist_min) return 0;
+	if (v >= v_hist_max) return n_speed_bins - 1;
+	int bin = floor(n_speed_bins * log(v / v_hist_min) / log(v_hist_max / v_hist_min));
+	return min(max(bin, 0), n_speed_bins - 1);
+}
+
+// Acumula (estilo bincount) el estado final de una realización sobre las realizaciones previas.
+// Filas de histogram: agentes, infectados, suma de tiempos de infección, suma de casos secundarios.
+// Infectado = infection_time >= 0 (se asigna sólo al infectarse): los refractarios iniciales
+// (vacunados) no cuentan aunque su estado final no sea sano.
+void accumulate_speed_histogram( vector<particle>       &system        ,
+								 vector<KIND>           &infection_time,
+								 vector<size_t>         &secondary     ,
+								 vector<vector<double>> &histogram       )
+{
+	for (size_t p = 0; p < N; p++) {
+		int bin = speed_bin(system[p].velocity);
+		histogram[0][bin] += 1;
+		if (infection_time[p] >= 0) {
+			histogram[1][bin] += 1;
+			histogram[2][bin] += infection_time[p];
+			histogram[3][bin] += secondary[p];
+		}
+	}
+}
+
+
+/* TRAYECTORIAS BINARIAS */
+// Frame: x[n] (float32), y[n] (float32), estado[n] (int8), con n = ceil(N / anim_stride).
+// Índice (24 bytes por frame): offset (uint64), run (uint32), n (uint32), tiempo (float32),
+// velocidad activa (float32).
+// Cabecera (texto "clave = valor", data/trajectory_header.txt): L, N, anim_step, anim_stride.
+void print_trajectory_header(ofstream &header)
+{
+	header << "L = "           << L           << endl;
+	header << "N = "           << N           << endl;
+	header << "anim_step = "   << anim_step   << endl;
+	header << "anim_stride = " << anim_stride << endl;
+}
+
+void print_frame_tobinary( ofstream         &trajectory,
+						   ofstream         &traj_index,
+						   vector<particle> &system    ,
+						   uint32_t          run       ,
+						   int              &time_step   )
+{
+	vector<float>  x, y;
+	vector<int8_t> state;
+	for (size_t p = 0; p < N; p += anim_stride) {
+		x.push_back(static_cast<float>(system[p].x));
+		y.push_back(static_cast<float>(system[p].y));
+		state.push_back(static_cast<int8_t>(system[p].get_state()));
+	}
+
+	trajectory.seekp(0, ios_base::end);
+	uint64_t offset   = static_cast<uint64_t>(trajectory.tellp());
+	uint32_t n_agents = static_cast<uint32_t>(x.size());
+	float    time     = static_cast<float>(delta_time * (KIND)time_step);
+	float    velocity = static_cast<float>(active_velocity);
+
+	trajectory.write(reinterpret_cast<const char*>(x.data()),     n_agents * sizeof(float));
+	trajectory.write(reinterpret_cast<const char*>(y.data()),     n_agents * sizeof(float));
+	trajectory.write(reinterpret_cast<const char*>(state.data()), n_agents * sizeof(int8_t));
+
+	traj_index.write(reinterpret_cast<const char*>(&offset),   sizeof(offset));
+	traj_index.write(reinterpret_cast<const char*>(&run),      sizeof(run));
+	traj_index.write(reinterpret_cast<const char*>(&n_agents), sizeof(n_agents));
+	traj_index.write(reinterpret_cast<const char*>(&time),     sizeof(time));
+	traj_index.write(reinterpret_cast<const char*>(&velocity), sizeof(velocity));
+}
+
+
 //Print functiones
 void print_header(int n_simulaciones)
 {
@@ -167,11 +296,26 @@ void print_finalstate_tofile(ofstream       &file,
 	file << t_max << endl;
 }
 
+void print_speed_histogram_tofile(ofstream &file, vector<vector<double>> &histogram)
+{
+	KIND log_width = log(v_hist_max / v_hist_min) / n_speed_bins;
+	file << "# v_low v_high agents infected t_inf_sum secondary_sum" << endl;
+	for (int bin = 0; bin < n_speed_bins; bin++) {
+		file << v_hist_min * exp(bin * log_width)       << " ";
+		file << v_hist_min * exp((bin + 1) * log_width) << " ";
+		file << histogram[0][bin] << " ";
+		file << histogram[1][bin] << " ";
+		file << histogram[2][bin] << " ";
+		file << histogram[3][bin] << endl;
+	}
+}
+
 void print_simulation_parameters(ofstream &file)
 {
 	file << "L               = "   << L << endl;
 	file << "N               = "   << N << endl;
 	file << "dt              = "   << delta_time << endl;
+	file << "replicas        = "   << n_replicas << endl;
 	file << "active_vel      = "   << active_velocity << endl;
 	file << "Vel Distribut   = "   << velocity_distribution << endl;
 	file << "tau Rotation    = "   << alpha << endl;
@@ -20,6 +20,8 @@ class particle {
 		KIND x,y;
 		KIND velocity;
 		KIND angle;
+		// Índice del agente que lo infectó (-1 si no fue infectado por contacto).
+		int  infector;
 
 	// Constuctores:
 	particle();
@@ -44,6 +46,7 @@ particle::particle() {
 	angle    = 0;
 	x        = 0;
 	y        = 0;
+	infector = -1;
 }
 
 /*Constructor of a particle in a given phase-state (x,p) of the system */
@@ -52,6 +55,7 @@ particle::particle(KIND x1, KIND y1, KIND vel, KIND ang) {
 	angle    = ang;
 	x        = x1;
 	y        = y1;
+	infector = -1;
 }
 
 
@@ -230,6 +234,7 @@ particle evolution(vector<particle> &system, vector<int> &index, bool inter){
 		if (Agent.is_healthy() && system[index[i]].is_infected()) {
 			if (dis(gen) < p_transmision) {
 				Agent.set_infected();
+				Agent.infector = index[i];
 				flag = false; // No puede volverse refractaria en esta instancia de evolución.
 			}
 		}
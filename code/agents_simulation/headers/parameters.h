@@ -1,38 +1,51 @@
 #pragma once
 #define KIND float  
 
+/* Los parámetros no const pueden sobrescribirse en tiempo de ejecución con un archivo
+ * "clave = valor" (ver load_parameters en agentes.h). Los valores de abajo son los default. */
+
 //Parametros principales:
-const size_t N = 1000; //Cantidad de agentes.
-const KIND   L = 150;   //Largo del sistema. Area = L*L.
+size_t N = 1000; //Cantidad de agentes.
+KIND   L = 150;   //Largo del sistema. Area = L*L.
 
 //Parametros de evolución del sistema.
 //Pre-condición para estos parámetros (dt * v < 0.1):
-const KIND delta_time = 0.05;
+KIND delta_time = 0.05;
 KIND active_velocity  = 0.01; //Velocidad de las partículas cuando no interactúan.
 
 //0 -> dist. exponencial, 1 -> dist. power law. Cualquier otro dist. uniforme.
-const int velocity_distribution = -1;
+int velocity_distribution = -1;
+
+//Barrido de velocidades activas [v_start, v_stop) y realizaciones por velocidad.
+KIND   v_start    = 0.055,
+	   v_stop     = 0.15,
+	   v_step     = 0.005;
+size_t n_replicas = 300;
 
 const KIND delta = 50; // wave profile change
 const KIND x_wave = 20; // wave profile change
 
 //Condición inicial SIR
-const KIND   p_init  = 0.0, //Infectadas iniciales.
-			 p_rinit = 0.0, //Refractarias iniciales (elegidas al azar).
+KIND   p_init  = 0.0; //Infectadas iniciales.
+const KIND   p_rinit = 0.0, //Refractarias iniciales (elegidas al azar).
 			 p_dinit = 0.0; //Refractarias iniciales (elegidas a partir de lista de velocidades).
 
 const int spin = 3; //Estados internos.
 
-const bool animation = false;
-const int  anim_step = 50;
+//Trayectorias binarias (data/trajectory.bin): un frame cada anim_step pasos,
+//guardando uno de cada anim_stride agentes.
+const bool animation   = false;
+const int  anim_step   = 50;
+const int  anim_stride = 1;
 
 /*Tiempos característicos y probabilidades por unidad de tiempo*/
-const KIND  tau_t = 0  , p_transmision = 1, //p_transmision = (1 / tau_t) * delta_time, //sane---->infected
-			tau_i = 200, p_infection   = (1 / tau_i) * delta_time, //infected--->refractary
+//Las probabilidades se recalculan en update_derived_parameters si cambian los tiempos.
+const KIND  tau_t = 0  , p_transmision = 1; //p_transmision = (1 / tau_t) * delta_time, //sane---->infected
+KIND		tau_i = 200, p_infection   = (1 / tau_i) * delta_time, //infected--->refractary
 			tau_r = 500, p_recfractary = (1 / tau_r) * delta_time; //refractary--->sane
 
 
-const KIND alpha = 100, p_rotation = (1 / alpha) * delta_time;    // tumbling rates angle_1 -> angle_2
+KIND alpha = 100, p_rotation = (1 / alpha) * delta_time;    // tumbling rates angle_1 -> angle_2
 
 
 /* Para distribución power-law hay que fitear las constantes */
@@ -41,9 +54,15 @@ const KIND alpha = 100, p_rotation = (1 / alpha) * delta_time;    // tumbling ra
 // 2.0960715631010567, //  v=0.05
 // 2.2303794574079356, //  v=0.04
 
-const KIND  k_powerl = 2.09600,            
-			v_min    = 0.01,
-            v_max    = 4.;
+KIND  k_powerl = 2.09600,
+	  v_min    = 0.01,
+	  v_max    = 4.;
+
+/* Histogramas de infección resueltos en velocidad (bins logarítmicos) */
+// Los agentes fuera de [v_hist_min, v_hist_max) se acumulan en el primer/último bin.
+const int   n_speed_bins = 60;
+KIND        v_hist_min   = 1e-4,
+			v_hist_max   = 4.;
 
 //Constantes:
 const KIND  Pi       = 3.14159265358979323846,
@@ -1,4 +1,5 @@
 import os
+from glob import glob
 from sys import argv
 from termcolor import colored,cprint
 
@@ -25,10 +26,14 @@ try:
 except:
 	pass #corregir esto
 
-os.chdir("./data")
+# Limpieza de data/*.txt solo si se pide explícitamente (segundo argumento = 1).
+# Los barridos con driver.py corren en directorios propios dentro de cache/.
 try:
-	os.system("del *.txt")
-except Exception as error:
-	print(f"Eror: {error}")
+	clean = int(argv[2])
+except (IndexError, ValueError):
+	clean = 0
+if clean:
+	for file in glob(os.path.join("data", "*.txt")):
+		os.remove(file)
 
 
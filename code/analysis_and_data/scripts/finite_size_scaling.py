@@ -0,0 +1,366 @@
+import numpy as np
+import os
+import matplotlib.pyplot as plt
+from concurrent.futures import ProcessPoolExecutor
+from itertools import cycle, permutations
+from scipy.optimize import minimize
+from typing import Dict, List, Optional, Tuple
+
+colors = cycle(["blue", "green", "orange"])
+
+# Each curve is (N, velocities, outbreak sizes n_R).
+Curve = Tuple[float, np.array, np.array]
+
+# =======================================================================================#
+# Data files
+# =======================================================================================#
+DATA_PATH = "../data/fig1"
+
+system_size_files: Dict[str, Dict[int, Tuple[str, str]]] = {
+    "uniform": {
+        1000: ("N=1k", "uniform"),
+        5000: ("N=5k", "uniform_5k"),
+    },
+    "exponential": {
+        1000: ("N=1k", "exponential"),
+        5000: ("N=5k", "exponential_5k"),
+        10000: ("N=10k", "exponential_10k"),
+    },
+    "power_law_alpha=4": {
+        1000: ("N=1k", "power_law_alpha=4"),
+        5000: ("N=5k", "power_law_5k_alpha=4"),
+    },
+}
+
+# =======================================================================================#
+# Constants
+# =======================================================================================#
+RHO = 1000 / 150**2
+TAU_I = 200
+SIGMA = 4
+PHI = 1.4 * RHO * SIGMA * TAU_I
+
+v_critical_theo = {
+    "uniform": 2 / PHI,
+    "exponential": 1 / PHI,
+    "power_law_alpha=4": (3 / 4) * (2 / PHI),
+}
+labels = {
+    "uniform": "Uniform",
+    "exponential": "Exponential",
+    "power_law_alpha=4": "Power Law (q=4)",
+}
+
+
+# =======================================================================================#
+# HELPER FUNCTIONS
+# =======================================================================================#
+def load_system_sizes(
+    distribution: str, v_max: Optional[float] = None
+) -> List[Curve]:
+    """Load every available system size of `distribution`.
+
+    Curves are cut at `v_max` (by default the largest velocity shared by all sizes),
+    so that the collapse is only fitted on the common velocity window.
+    """
+    curves = []
+    for n_agents, (folder, sim_file) in system_size_files[distribution].items():
+        velocities = np.load(os.path.join(DATA_PATH, folder, f"velocities_{sim_file}.npy"))
+        r_infi = np.load(os.path.join(DATA_PATH, folder, f"{sim_file}.npy"))
+        curves.append((n_agents, velocities, r_infi))
+
+    if v_max is None:
+        v_max = min(velocities.max() for _, velocities, _ in curves)
+    return [(n, v[v <= v_max], r[v <= v_max]) for n, v, r in curves]
+
+
+def level_crossing(
+    velocities: np.array, r_infi: np.array, level: float
+) -> Optional[float]:
+    """First velocity at which r_infi reaches `level` (log-linear interpolation)."""
+    indices_above_level = np.where(r_infi >= level)[0]
+    if len(indices_above_level) == 0 or indices_above_level.min() == 0:
+        return None
+    k = indices_above_level.min()
+    log_r = np.log(r_infi[k - 1 : k + 1])
+    return np.interp(np.log(level), log_r, velocities[k - 1 : k + 1])
+
+
+def threshold_window(curves: List[Curve], r_min: float = 5.0) -> List[Curve]:
+    """Drop the subcritical plateau n_R < r_min (a few agents infected at any N).
+
+    The plateau does not scale with N, so fitting it rewards any (v_c, b) that maps it
+    onto itself and pulls v_c towards the end of the data.
+    """
+    return [(n, v[r >= r_min], r[r >= r_min]) for n, v, r in curves]
+
+
+def v_c_range(curves: List[Curve], min_side: int) -> Optional[Tuple[float, float]]:
+    """Open interval of v_c with at least `min_side` points on each side on every curve.
+
+    None if the curves leave no such interval.
+    """
+    if any(len(velocities) < 2 * min_side for _, velocities, _ in curves):
+        return None
+    lo = max(np.sort(velocities)[min_side - 1] for _, velocities, _ in curves)
+    hi = min(np.sort(velocities)[-min_side] for _, velocities, _ in curves)
+    return (lo, hi) if lo < hi else None
+
+
+# =======================================================================================#
+# COLLAPSE QUALITY
+# =======================================================================================#
+def collapse_quality(
+    curves: List[Curve],
+    v_c: np.array,
+    b: np.array,
+    a: Optional[np.array] = None,
+    min_overlap: int = 4,
+) -> Tuple[np.array, np.array]:
+    """Quality S of the collapse n_R N^{-a} = F((v - v_c) N^b), vectorised over parameters.
+
+    For every ordered pair of system sizes (i, j), each point of curve i is mapped onto
+    the velocity axis of curve j, v' = v_c + (v - v_c) (N_i / N_j)^b, and compared with
+    the linear interpolation of curve j there. Interpolating in v is exact because the
+    scaling variable is an affine function of v. S is the mean squared residual of
+    log(n_R N^{-a}) over all points that fall inside the range of curve j.
+
+    `v_c`, `b` (and `a`) broadcast against each other. If `a` is None it is profiled out
+    in closed form, since the residuals are linear in a. Returns (S, a); S is inf where
+    fewer than `min_overlap` points overlap.
+    """
+    shape = np.broadcast_shapes(np.shape(v_c), np.shape(b), np.shape(a))
+    v_c = np.broadcast_to(np.asarray(v_c, dtype=float), shape)[..., None]
+    b = np.broadcast_to(np.asarray(b, dtype=float), shape)[..., None]
+
+    dd_sum, dl_sum, ll_sum, count = (np.zeros(v_c.shape[:-1]) for _ in range(4))
+    for (n_i, v_i, r_i), (n_j, v_j, r_j) in permutations(curves, 2):
+        v_mapped = v_c + (v_i - v_c) * (n_i / n_j) ** b
+        valid = (v_mapped >= v_j.min()) & (v_mapped <= v_j.max())
+        d = np.log(r_i) - np.interp(v_mapped, v_j, np.log(r_j))
+        log_ratio = np.log(n_i / n_j)
+
+        d = np.where(valid, d, 0)
+        dd_sum += (d**2).sum(axis=-1)
+        dl_sum += log_ratio * d.sum(axis=-1)
+        ll_sum += log_ratio**2 * valid.sum(axis=-1)
+        count += valid.sum(axis=-1)
+
+    # residual = d - a * log(N_i / N_j)  ->  sum of squares is quadratic in a.
+    if a is None:
+        a = np.where(ll_sum > 0, dl_sum / np.where(ll_sum > 0, ll_sum, 1), 0)
+    a = np.broadcast_to(np.asarray(a, dtype=float), shape)
+    squares = dd_sum - 2 * a * dl_sum + a**2 * ll_sum
+
+    quality = np.full(shape, np.inf)
+    enough = count >= min_overlap
+    quality[enough] = squares[enough] / count[enough]
+    return quality, a
+
+
+def _refine(
+    args: Tuple[List[Curve], float, float, List[Tuple[float, float]]]
+) -> Tuple[float, float, float, bool]:
+    curves, v_c0, b0, bounds = args
+
+    def objective(p: np.array) -> float:
+        return float(collapse_quality(curves, p[0], p[1])[0])
+
+    result = minimize(
+        objective,
+        x0=[v_c0, b0],
+        method="Nelder-Mead",
+        bounds=bounds,
+        options={"xatol": 1e-7, "fatol": 1e-10},
+    )
+    return result.x[0], result.x[1], result.fun, result.success
+
+
+def _half_width(scan: np.array, quality: np.array, threshold: float) -> float:
+    """Half width of the region of `scan` around the minimum where quality <= threshold.
+
+    nan unless the quality rises above `threshold` on both sides within the scan, i.e.
+    if the minimum is not bracketed (it keeps improving towards an end of the scan).
+    """
+    center = np.argmin(quality)
+    below = quality <= threshold
+    left = center
+    while left > 0 and below[left - 1]:
+        left -= 1
+    right = center
+    while right < len(scan) - 1 and below[right + 1]:
+        right += 1
+    if left == 0 or right == len(scan) - 1:
+        return np.nan
+    if not (np.isfinite(quality[left - 1]) and np.isfinite(quality[right + 1])):
+        return np.nan
+    return (scan[right] - scan[left]) / 2
+
+
+# =======================================================================================#
+# MAIN FUNCTIONS
+# =======================================================================================#
+def fit_collapse(
+    curves: List[Curve],
+    b_grid: np.array,
+    min_side: int = 3,
+    n_v_c: int = 141,
+    n_starts: int = 4,
+    rise: float = 0.1,
+    workers: int = os.cpu_count() or 1,
+) -> Dict[str, float]:
+    """Fit (v_c, b, a) by optimising the collapse quality.
+
+    The v_c grid has `n_v_c` points strictly inside `v_c_range`, so that every curve
+    keeps `min_side` points on each side of v_c. The quality is evaluated on the full
+    (v_c, b) grid in one vectorised call, and the `n_starts` best grid points are
+    refined in parallel with Nelder-Mead inside the grid bounds. The uncertainty of
+    each parameter is the half width of the interval in which the quality stays within
+    a factor (1 + rise) of its minimum, the others held fixed.
+
+    `status` is "interior" only if Nelder-Mead converged and the minimum is bracketed
+    in both v_c and b. Otherwise ("too few points", "not converged", "not bracketed")
+    the fit is not a minimum of the quality and all errors are nan.
+    """
+    fit = {"status": "too few points", "interior": False, "quality": np.nan}
+    fit.update({key: np.nan for key in ("v_c", "b", "a", "v_c_err", "b_err", "a_err")})
+    window = v_c_range(curves, min_side)
+    if window is None:
+        return fit
+
+    v_c_grid = np.linspace(*window, n_v_c + 2)[1:-1]
+    V_C, B = np.meshgrid(v_c_grid, b_grid, indexing="ij")
+    quality, _ = collapse_quality(curves, V_C, B)
+
+    starts = np.argsort(quality, axis=None)[:n_starts]
+    bounds = [(v_c_grid.min(), v_c_grid.max()), (b_grid.min(), b_grid.max())]
+    jobs = [(curves, V_C.flat[k], B.flat[k], bounds) for k in starts]
+    with ProcessPoolExecutor(max_workers=min(workers, n_starts)) as pool:
+        refined = list(pool.map(_refine, jobs))
+    v_c, b, s_min, converged = min(refined, key=lambda result: result[2])
+    _, a = collapse_quality(curves, v_c, b)
+    a = float(a)
+
+    fit.update(v_c=v_c, b=b, a=a, quality=s_min)
+    if not converged:
+        fit["status"] = "not converged"
+        return fit
+
+    # Scans stay inside the grid bounds; a quality still within the threshold at a bound
+    # means the optimum is only where the data ends.
+    threshold = s_min * (1 + rise)
+    v_c_scan = np.linspace(*bounds[0], 2001)
+    b_scan = np.linspace(*bounds[1], 2001)
+    a_scan = a + np.linspace(-1, 1, 2001)
+    errors = {
+        "v_c_err": _half_width(
+            v_c_scan, collapse_quality(curves, v_c_scan, b, a)[0], threshold
+        ),
+        "b_err": _half_width(b_scan, collapse_quality(curves, v_c, b_scan, a)[0], threshold),
+        "a_err": _half_width(a_scan, collapse_quality(curves, v_c, b, a_scan)[0], threshold),
+    }
+    if np.isnan(errors["v_c_err"]) or np.isnan(errors["b_err"]):
+        fit["status"] = "not bracketed"
+        return fit
+
+    fit.update(errors, status="interior", interior=True)
+    return fit
+
+
+def extrapolate_threshold(
+    curves: List[Curve], fit: Dict[str, float], level: Optional[float] = None
+) -> Tuple[np.array, np.array, np.array]:
+    """Pseudo-critical velocities v_c(N) and the fit v_c(N) = v_c + c N^{-b}.
+
+    v_c(N) is the velocity at which the rescaled size n_R N^{-a} reaches `level`
+    (by default the geometric mean of all rescaled sizes). Returns (N, v_c(N), [v_c, c]),
+    where v_c is the large-N limit; it is nan if fewer than two sizes cross the level.
+    """
+    if level is None:
+        rescaled = [np.log(r_infi) - fit["a"] * np.log(n) for n, _, r_infi in curves]
+        level = np.exp(np.concatenate(rescaled).mean())
+
+    n_values, v_c_values = [], []
+    for n_agents, velocities, r_infi in curves:
+        v_c_n = level_crossing(velocities, r_infi * n_agents ** (-fit["a"]), level)
+        if v_c_n is not None:
+            n_values.append(n_agents)
+            v_c_values.append(v_c_n)
+    n_values, v_c_values = np.array(n_values, dtype=float), np.array(v_c_values)
+
+    if len(n_values) < 2:
+        return n_values, v_c_values, np.full(2, np.nan)
+    design = np.column_stack([np.ones_like(n_values), n_values ** (-fit["b"])])
+    coefficients, *_ = np.linalg.lstsq(design, v_c_values, rcond=None)
+    return n_values, v_c_values, coefficients
+
+
+def plot_collapse(curves: List[Curve], fit: Dict[str, float], label: str) -> None:
+    for (n_agents, velocities, r_infi), color in zip(curves, ["blue", "green", "orange"]):
+        x = (velocities - fit["v_c"]) * n_agents ** fit["b"]
+        y = r_infi * n_agents ** (-fit["a"])
+        plt.plot(x, y, linewidth=3, color=color, label=f"N={n_agents}")
+        plt.scatter(x, y, color=color)
+
+    plt.yscale("log")
+    plt.xlabel(r"$(\langle v \rangle - v_c) N^{b}$", fontsize=15)
+    plt.ylabel(r"$\langle n_r \rangle N^{-a}$", fontsize=15)
+    plt.title(
+        f"{label}: $v_c$={fit['v_c']:.4f}, b={fit['b']:.2f}, a={fit['a']:.2f}",
+        fontsize=12,
+    )
+
+
+if __name__ == "__main__":
+    # b = 0 is excluded: there the scaling variable does not depend on N and any set of
+    # curves that coincide below threshold "collapses" trivially.
+    b_grid = np.linspace(0.05, 1.0, 96)
+
+    extrapolations = {}
+    for distribution, label in labels.items():
+        curves = threshold_window(load_system_sizes(distribution))
+        fit = fit_collapse(curves, b_grid)
+
+        print(f"{label} (N = {[n for n, _, _ in curves]})")
+        if not fit["interior"]:
+            print(f"  no credible collapse ({fit['status']}", end="")
+            if np.isfinite(fit["v_c"]):
+                print(f": v_c = {fit['v_c']:.5f}, b = {fit['b']:.3f}", end="")
+            print(f"); theory v_c = {v_critical_theo[distribution]:.5f}; skipped")
+            continue
+        print(f"  v_c = {fit['v_c']:.5f} +/- {fit['v_c_err']:.5f}", end="  ")
+        print(f"(theory: {v_critical_theo[distribution]:.5f})")
+        print(f"  b   = {fit['b']:.3f} +/- {fit['b_err']:.3f}")
+        print(f"  a   = {fit['a']:.3f} +/- {fit['a_err']:.3f}")
+        print(f"  S   = {fit['quality']:.3e}")
+
+        plot_collapse(curves, fit, label)
+        plt.legend(fontsize=12)
+        plt.tight_layout()
+        plt.savefig(f"../images/collapse_fss_{distribution}.png", dpi=300)
+        plt.show()
+        plt.close()
+
+        extrapolations[label] = extrapolate_threshold(curves, fit), fit["b"]
+
+    # =======================================================================================#
+    # LARGE-N EXTRAPOLATION OF THE THRESHOLD (interior fits only)
+    # =======================================================================================#
+    if not extrapolations:
+        raise SystemExit("No interior collapse fit; nothing to extrapolate.")
+
+    for label, ((n_values, v_c_values, (v_c_infinity, slope)), b) in extrapolations.items():
+        color = next(colors)
+        print(f"{label}: v_c(N -> inf) = {v_c_infinity:.5f}")
+        if np.isnan(v_c_infinity):
+            continue
+        plt.scatter(n_values ** (-b), v_c_values, color=color, s=70, label=label)
+        x = np.linspace(0, n_values.min() ** (-b), 50)
+        plt.plot(x, v_c_infinity + slope * x, color=color, linestyle="dashed")
+
+    plt.xlabel(r"$N^{-b}$", fontsize=15)
+    plt.ylabel(r"$\langle v \rangle_c(N)$", fontsize=15)
+    plt.legend(fontsize=12)
+    plt.tight_layout()
+    plt.savefig("../images/v_c_extrapolation.png", dpi=300)
+    plt.show()
@@ -0,0 +1,202 @@
+import numpy as np
+import time
+import matplotlib.pyplot as plt
+from scipy.integrate import solve_ivp
+from typing import Dict, Tuple
+
+# =======================================================================================#
+# Constants
+# =======================================================================================#
+RHO = 1000 / 150**2
+TAU_I = 200
+SIGMA = 4
+PHI = 1.4 * RHO * SIGMA * TAU_I
+N = 1000
+
+# Contact rate of an agent of speed v: LAMBDA * v = 0.7 * sigma * rho * v. With the
+# force of infection weighted by the speed of the infected, R0 = (PHI / 2) <v^2> / <v>,
+# which reproduces the thresholds of outbreak_size_* (v_c = 2 / PHI for uniform speeds).
+LAMBDA = PHI / (2 * TAU_I)
+
+# Truncation of the power law in parameters.h; only the ratio v_max / v_min is kept, the
+# scale is fixed by <v>.
+V_MIN = 0.01
+V_MAX = 4.0
+
+# velocity_distribution codes, as in parameters.h.
+EXPONENTIAL, POWER_LAW, UNIFORM = 0, 1, -1
+
+
+# =======================================================================================#
+# SPEED CLASSES
+# =======================================================================================#
+def _power_integral(a: np.array, b: np.array, p: np.array) -> np.array:
+    """Integral of v^p between a and b (p = -1 handled as a logarithm)."""
+    p_safe = np.where(p == -1, 0, p)
+    return np.where(
+        p == -1, np.log(b / a), (b ** (p_safe + 1) - a ** (p_safe + 1)) / (p_safe + 1)
+    )
+
+
+def speed_classes(
+    mean_v: np.array, q: np.array, velocity_distribution: np.array, n_classes: int
+) -> Tuple[np.array, np.array]:
+    """Speeds and weights of `n_classes` equal-probability classes for every point.
+
+    Class k holds the quantiles [k/K, (k+1)/K) and has the conditional mean speed of that
+    interval, so <v> is exact and classes are sorted by speed. The power law has density
+    v^{-q} on [v_lo, v_lo * V_MAX / V_MIN], with v_lo set by <v>. Shapes are (P, K).
+    """
+    mean_v, q, velocity_distribution = (
+        x[:, None] for x in np.broadcast_arrays(mean_v, q, velocity_distribution)
+    )
+    u = np.linspace(0, 1, n_classes + 1)
+    u_lo, u_hi = u[:-1], u[1:]
+
+    # Exponential: edges v = -<v> log(1 - u), conditional mean from the survival function.
+    survival_lo, survival_hi = 1 - u_lo, 1 - u_hi
+    edge_lo = -np.log(survival_lo)
+    edge_hi = -np.log(np.where(survival_hi > 0, survival_hi, 1))
+    exponential = mean_v * (
+        1 + (edge_lo * survival_lo - edge_hi * survival_hi) / (u_hi - u_lo)
+    )
+
+    # Truncated power law on [1, ratio], rescaled to mean <v>.
+    ratio = V_MAX / V_MIN
+    one_minus_q = np.where(q == 1, 1e-12, 1 - q)
+    norm = 1 - ratio**one_minus_q
+    lo = (1 - u_lo * norm) ** (1 / one_minus_q)
+    hi = (1 - u_hi * norm) ** (1 / one_minus_q)
+    power_law = _power_integral(lo, hi, 1 - q) / _power_integral(lo, hi, -q)
+    unit_mean = _power_integral(1.0, ratio, 1 - q) / _power_integral(1.0, ratio, -q)
+    power_law = mean_v * power_law / unit_mean
+
+    speeds = np.select(
+        [velocity_distribution == EXPONENTIAL, velocity_distribution == POWER_LAW],
+        [exponential, power_law],
+        default=np.broadcast_to(mean_v, exponential.shape),
+    )
+    weights = np.full(speeds.shape, 1 / n_classes)
+    return speeds, weights
+
+
+def vaccinated_fraction(weights: np.array, f: np.array, directed: np.array) -> np.array:
+    """Fraction of each class vaccinated: f everywhere (random) or the fastest first (directed)."""
+    f, directed = f[:, None], directed[:, None]
+    # Weight of the classes faster than k (classes are sorted by speed).
+    faster = np.cumsum(weights[:, ::-1], axis=1)[:, ::-1] - weights
+    directed_fraction = np.clip((f - faster) / weights, 0, 1)
+    return np.where(directed, directed_fraction, np.broadcast_to(f, weights.shape))
+
+
+# =======================================================================================#
+# MAIN FUNCTIONS
+# =======================================================================================#
+def solve_mean_field(
+    mean_v: np.array,
+    q: np.array = 4.0,
+    f: np.array = 0.0,
+    strategy: np.array = "random",
+    velocity_distribution: np.array = POWER_LAW,
+    n_classes: int = 100,
+    t_max: float = 200 * TAU_I,
+    n_times: int = 400,
+    n_agents: int = N,
+) -> Dict[str, np.array]:
+    """Speed-class-resolved SIR mean field for a batch of points, integrated as one system.
+
+    For class k (speed v_k, weight w_k):
+        ds_k/dt = -LAMBDA v_k s_k Theta,   di_k/dt = LAMBDA v_k s_k Theta - i_k / TAU_I,
+        Theta   = sum_l w_l v_l i_l / <v>.
+    Parameters broadcast to P points; `strategy` is "random" or "directed". Vaccinated
+    agents start refractory and one agent (1 / n_agents) starts infected. Returns the
+    times, the S, I, R time courses (P, T), R0 and the final outbreak size n_R excluding
+    the vaccinated.
+    """
+    mean_v, q, f, strategy, velocity_distribution = np.broadcast_arrays(
+        *(np.atleast_1d(x) for x in (mean_v, q, f, strategy, velocity_distribution))
+    )
+    mean_v, q, f = (np.asarray(x, dtype=float) for x in (mean_v, q, f))
+    speeds, weights = speed_classes(mean_v, q, velocity_distribution, n_classes)
+    vaccinated = vaccinated_fraction(weights, f, strategy == "directed")
+
+    susceptible = 1 - vaccinated
+    seed = susceptible / (n_agents * (weights * susceptible).sum(axis=1, keepdims=True))
+    y0 = np.concatenate([(susceptible - seed).ravel(), seed.ravel()])
+
+    infection_rate = LAMBDA * speeds
+    contact_weight = weights * speeds / mean_v[:, None]
+    n_state = speeds.size
+
+    def rhs(t: float, y: np.array) -> np.array:
+        s = y[:n_state].reshape(speeds.shape)
+        i = y[n_state:].reshape(speeds.shape)
+        theta = (contact_weight * i).sum(axis=1, keepdims=True)
+        new_infections = infection_rate * s * theta
+        return np.concatenate([-new_infections.ravel(), (new_infections - i / TAU_I).ravel()])
+
+    t_eval = np.linspace(0, t_max, n_times)
+    solution = solve_ivp(rhs, (0, t_max), y0, t_eval=t_eval, rtol=1e-6, atol=1e-10)
+
+    s = solution.y[:n_state].reshape(*speeds.shape, -1)
+    i = solution.y[n_state:].reshape(*speeds.shape, -1)
+    S = np.einsum("pk,pkt->pt", weights, s)
+    I = np.einsum("pk,pkt->pt", weights, i)
+    R = 1 - S - I
+
+    r0 = LAMBDA * TAU_I * (weights * speeds**2 * susceptible).sum(axis=1) / mean_v
+    return {
+        "t": solution.t,
+        "S": S,
+        "I": I,
+        "R": R,
+        "R0": r0,
+        "n_R": n_agents * (R[:, -1] - f),
+    }
+
+
+def needs_simulation(result: Dict[str, np.array], band: float = 0.25) -> np.array:
+    """Points whose R0 lies within `band` of 1.
+
+    Near threshold, stochastic extinction and finite-size effects dominate, so the mean
+    field is least reliable there; elsewhere it can stand in for agent-based runs.
+    """
+    return np.abs(result["R0"] - 1) < band
+
+
+if __name__ == "__main__":
+    # =======================================================================================#
+    # DENSE SCAN: <v> x f x strategy for the power law (q=4)
+    # =======================================================================================#
+    v_values = np.linspace(0.01, 0.06, 51)
+    f_values = np.array([0.0, 0.05, 0.1, 0.2, 0.3])
+    strategies = np.array(["random", "directed"])
+
+    V, F, STRATEGY = np.meshgrid(v_values, f_values, strategies, indexing="ij")
+
+    start = time.time()
+    result = solve_mean_field(V.ravel(), q=4.0, f=F.ravel(), strategy=STRATEGY.ravel())
+    print(f"{V.size} points integrated in {time.time() - start:.2f} s")
+
+    to_simulate = needs_simulation(result)
+    print(f"{to_simulate.sum()} / {V.size} points near threshold need agent-based runs")
+
+    n_r = result["n_R"].reshape(V.shape)
+    for k, strategy in enumerate(strategies):
+        linestyle = "-" if strategy == "random" else "dashed"
+        for j, f in enumerate(f_values):
+            plt.plot(
+                v_values,
+                n_r[:, j, k],
+                linewidth=3,
+                linestyle=linestyle,
+                color=plt.cm.viridis(j / len(f_values)),
+                label=f"f={f} ({strategy})",
+            )
+
+    plt.xlabel(r"$\langle v \rangle$", fontsize=15)
+    plt.ylabel(r"$\langle n_r \rangle - N_v$", fontsize=15)
+    plt.legend(fontsize=8, ncol=2)
+    plt.tight_layout()
+    plt.savefig("../images/mean_field_scan.png", dpi=300)
+    plt.show()
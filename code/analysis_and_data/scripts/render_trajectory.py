@@ -0,0 +1,197 @@
+import argparse
+import os
+import shutil
+import subprocess
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+import matplotlib
+
+matplotlib.use("Agg")
+
+import matplotlib.pyplot as plt
+import numpy as np
+
+# =======================================================================================#
+# Binary layout (see print_frame_tobinary in agents_simulation/headers/agentes.h)
+# =======================================================================================#
+# Each frame is stored as three contiguous blocks: x[n] float32, y[n] float32, state[n] int8.
+# The index file holds one fixed-size record per frame, including the active velocity of
+# its run. The header file holds L, N, anim_step and anim_stride as "key = value" lines.
+INDEX_DTYPE = np.dtype(
+    [
+        ("offset", "<u8"),
+        ("run", "<u4"),
+        ("n_agents", "<u4"),
+        ("time", "<f4"),
+        ("velocity", "<f4"),
+    ]
+)
+
+TRAJECTORY_FILE = "../../agents_simulation/data/trajectory.bin"
+INDEX_FILE = "../../agents_simulation/data/trajectory_index.bin"
+HEADER_FILE = "../../agents_simulation/data/trajectory_header.txt"
+
+# =======================================================================================#
+# Constants
+# =======================================================================================#
+STATE_COLORS = np.array(["blue", "red", "green"])  # healthy, infected, refractory
+
+
+# =======================================================================================#
+# HELPER FUNCTIONS
+# =======================================================================================#
+def load_index(index_path: str) -> np.ndarray:
+    return np.fromfile(index_path, dtype=INDEX_DTYPE)
+
+
+def load_header(header_path: str) -> Dict[str, float]:
+    """Read the "key = value" header written with the trajectories (L, N, ...)."""
+    header = {}
+    with open(header_path) as file:
+        for line in file:
+            key, _, value = line.partition("=")
+            if value:
+                header[key.strip()] = float(value)
+    return header
+
+
+def open_trajectory(trajectory_path: str) -> np.memmap:
+    return np.memmap(trajectory_path, dtype=np.uint8, mode="r")
+
+
+def read_frame(
+    trajectory: np.memmap, record: np.void, stride: int = 1
+) -> Tuple[np.array, np.array, np.array]:
+    """Return (x, y, state) of one frame as views into the memory-mapped file."""
+    n = int(record["n_agents"])
+    start = int(record["offset"])
+    x = trajectory[start : start + 4 * n].view("<f4")
+    y = trajectory[start + 4 * n : start + 8 * n].view("<f4")
+    state = trajectory[start + 8 * n : start + 9 * n].view(np.int8)
+    return x[::stride], y[::stride], state[::stride]
+
+
+def select_frames(
+    index: np.ndarray, run: Optional[int] = None, every: int = 1
+) -> np.array:
+    """Frame numbers of `run` (all runs if None), keeping one frame out of `every`."""
+    frames = np.arange(len(index))
+    if run is not None:
+        frames = frames[index["run"] == run]
+    return frames[::every]
+
+
+def _render_chunk(
+    args: Tuple[str, str, List[int], str, float, int, int]
+) -> List[str]:
+    trajectory_path, index_path, frames, out_dir, box, stride, dpi = args
+    trajectory = open_trajectory(trajectory_path)
+    index = load_index(index_path)
+
+    fig, ax = plt.subplots(figsize=(6, 6))
+    paths = []
+    for frame in frames:
+        record = index[frame]
+        x, y, state = read_frame(trajectory, record, stride)
+
+        ax.clear()
+        ax.scatter(x, y, c=STATE_COLORS[np.clip(state, 0, 2)], s=2)
+        ax.set_xlim(0, box)
+        ax.set_ylim(0, box)
+        ax.set_aspect("equal")
+        ax.set_title(
+            f"run {record['run']}   v = {record['velocity']:.4g}   t = {record['time']:.1f}"
+        )
+
+        path = os.path.join(out_dir, f"frame_{frame:06d}.png")
+        fig.savefig(path, dpi=dpi)
+        paths.append(path)
+    plt.close(fig)
+    return paths
+
+
+# =======================================================================================#
+# MAIN FUNCTIONS
+# =======================================================================================#
+def render_frames(
+    trajectory_path: str,
+    index_path: str,
+    out_dir: str,
+    box: Optional[float] = None,
+    header_path: str = HEADER_FILE,
+    run: Optional[int] = None,
+    every: int = 1,
+    stride: int = 1,
+    workers: int = os.cpu_count() or 1,
+    dpi: int = 100,
+) -> List[str]:
+    """Render the selected frames to PNG files using `workers` processes.
+
+    The box side defaults to the L stored in the trajectory header.
+    """
+    if box is None:
+        box = load_header(header_path)["L"]
+    os.makedirs(out_dir, exist_ok=True)
+    frames = select_frames(load_index(index_path), run, every)
+
+    # One contiguous chunk per worker, so that each worker reuses a single figure.
+    chunks = [chunk.tolist() for chunk in np.array_split(frames, workers) if len(chunk)]
+    jobs = [
+        (trajectory_path, index_path, chunk, out_dir, box, stride, dpi)
+        for chunk in chunks
+    ]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        paths = [path for chunk in pool.map(_render_chunk, jobs) for path in chunk]
+    return sorted(paths)
+
+
+def frames_to_video(frame_paths: List[str], output: str, fps: int = 25) -> None:
+    """Stitch rendered PNG frames into a video with ffmpeg."""
+    ffmpeg = shutil.which("ffmpeg")
+    if ffmpeg is None:
+        raise RuntimeError("ffmpeg not found; PNG frames were left in place.")
+
+    list_file = f"{output}.frames.txt"
+    with open(list_file, "w") as file:
+        for path in frame_paths:
+            file.write(f"file '{os.path.abspath(path)}'\n")
+            file.write(f"duration {1 / fps}\n")
+
+    command = [ffmpeg, "-y", "-f", "concat", "-safe", "0", "-i", list_file]
+    command += ["-pix_fmt", "yuv420p", "-vf", "pad=ceil(iw/2)*2:ceil(ih/2)*2", output]
+    subprocess.run(command, check=True)
+    os.remove(list_file)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Render binary agent trajectories.")
+    parser.add_argument("--trajectory", default=TRAJECTORY_FILE)
+    parser.add_argument("--index", default=INDEX_FILE)
+    parser.add_argument("--out-dir", default="../images/frames")
+    parser.add_argument("--header", default=HEADER_FILE)
+    parser.add_argument("--box", type=float, default=None, help="override the header's L")
+    parser.add_argument("--run", type=int, default=None)
+    parser.add_argument("--every", type=int, default=1, help="keep 1 of every n frames")
+    parser.add_argument("--stride", type=int, default=1, help="keep 1 of every n agents")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--video", default=None, help="e.g. ../images/spreading.mp4")
+    parser.add_argument("--fps", type=int, default=25)
+    args = parser.parse_args()
+
+    frame_paths = render_frames(
+        args.trajectory,
+        args.index,
+        args.out_dir,
+        box=args.box,
+        header_path=args.header,
+        run=args.run,
+        every=args.every,
+        stride=args.stride,
+        workers=args.workers,
+    )
+    print(f"Rendered {len(frame_paths)} frames into {args.out_dir}")
+
+    if args.video is not None:
+        frames_to_video(frame_paths, args.video, fps=args.fps)
+        print(f"Saved: {args.video}")